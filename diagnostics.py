@@ -1,45 +1,193 @@
 # diagnostics.py
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 
 class Diagnostics:
-    def __init__(self):
+    def __init__(self, num_procs=None):
         self.wait_graph = defaultdict(set)
-        self.last_access = {}
+        # Pids are dense small ints, so when the process count is known the
+        # access times live in a flat list indexed by pid (0.0 = never seen)
+        self.last_access = [0.0] * num_procs if num_procs else {}
         self.alert = ""
+        # Bumped on every wait-graph mutation so check_deadlock can skip
+        # the scan when nothing changed since the last pass.
+        self._version = 0
+        self._checked_version = -1
 
     def add_wait(self, waiter, owner):
+        """Record that `waiter` waits on `owner`.
+
+        A new cycle can only pass through the edge just added, so it is
+        enough to search from `owner` for a path back to `waiter`.
+        """
         self.wait_graph[waiter].add(owner)
-        self.check_deadlock()
+        self._version += 1
+
+        neighbors = self.wait_graph.get
+        parent = {owner: None}
+        stack = [owner]
+        while stack:
+            node = stack.pop()
+            if node == waiter:
+                cycle = []
+                while node is not None:
+                    cycle.append(node)
+                    node = parent[node]
+                cycle.append(waiter)
+                cycle.reverse()
+                self.alert = f"DEADLOCK: {' → '.join(f'P{p}' for p in cycle)}"
+                return
+            for neigh in neighbors(node, ()):
+                if neigh not in parent:
+                    parent[neigh] = node
+                    stack.append(neigh)
 
     def remove_wait(self, waiter):
+        # Removing edges cannot create a cycle; drop the alert and let the
+        # periodic check_deadlock re-detect any cycle that still exists.
         self.wait_graph.pop(waiter, None)
-        self.check_deadlock()
+        self._version += 1
+        self.alert = ""
 
     def check_deadlock(self):
-        visited, path = set(), []
-
-        def dfs(node):
-            if node in path:
-                cycle = path[path.index(node):] + [node]
-                self.alert = f"DEADLOCK: {' → '.join(f'P{p}' for p in cycle)}"
-                return True
-            if node in visited: return False
-            visited.add(node)
-            path.append(node)
-            for neigh in self.wait_graph.get(node, []):
-                if dfs(neigh): return True
-            path.pop()
-            return False
+        """Scan the whole wait-for graph for a cycle.
 
+        Waiters usually block on a single owner, so when every waiter has
+        at most one owner an allocation-free tortoise-and-hare walk is tried
+        first, capped at len(wait_graph) steps in total so it stays linear.
+        Multi-owner graphs, or walks that hit the cap, fall back to a single
+        iterative Tarjan SCC pass.
+        """
+        if self._checked_version == self._version:
+            return
+        self._checked_version = self._version
         self.alert = ""
-        for n in list(self.wait_graph.keys()):
-            if dfs(n): return
+
+        if all(len(owners) <= 1 for owners in self.wait_graph.values()):
+            budget = len(self.wait_graph)
+            for start in self.wait_graph:
+                meet, steps = self._detect_cycle_floyd(start, budget)
+                if meet is not None:
+                    self.alert = self._format_floyd_cycle(meet)
+                    return
+                budget -= steps
+                if budget <= 0:
+                    break
+            else:
+                # Every walk ended without meeting: no cycle
+                return
+
+        neighbors = self.wait_graph.get
+        index, lowlink = {}, {}
+        on_stack, stack = set(), []
+        counter = 0
+
+        for root in list(self.wait_graph.keys()):
+            if root in index:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(neighbors(root, ())))]
+
+            while work:
+                node, it = work[-1]
+                for neigh in it:
+                    if neigh not in index:
+                        index[neigh] = lowlink[neigh] = counter
+                        counter += 1
+                        stack.append(neigh)
+                        on_stack.add(neigh)
+                        work.append((neigh, iter(neighbors(neigh, ()))))
+                        break
+                    if neigh in on_stack and index[neigh] < lowlink[node]:
+                        lowlink[node] = index[neigh]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+                    if lowlink[node] != index[node]:
+                        continue
+                    component = set()
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.add(w)
+                        if w == node:
+                            break
+                    if len(component) > 1 or node in neighbors(node, ()):
+                        self.alert = self._format_cycle(node, component)
+                        return
+
+    def _next_owner(self, node):
+        owners = self.wait_graph.get(node)
+        if not owners:
+            return None
+        for owner in owners:
+            return owner
+
+    def _detect_cycle_floyd(self, start, max_steps):
+        """Follow one owner per node from `start` for at most `max_steps` steps.
+
+        Returns `(meet, steps)` where `meet` is a node on a cycle, or None if
+        the walk ran off the graph or out of steps.
+        """
+        next_owner = self._next_owner
+        slow = fast = start
+        steps = 0
+        while steps < max_steps:
+            steps += 1
+            slow = next_owner(slow)
+            fast = next_owner(fast)
+            if fast is None:
+                return None, steps
+            fast = next_owner(fast)
+            if slow is None or fast is None:
+                return None, steps
+            if slow == fast:
+                return slow, steps
+        return None, steps
+
+    def _format_floyd_cycle(self, meet):
+        """Walk the cycle found by _detect_cycle_floyd back around to `meet`."""
+        cycle = [meet]
+        node = self._next_owner(meet)
+        while node != meet:
+            cycle.append(node)
+            node = self._next_owner(node)
+        cycle.append(meet)
+        return f"DEADLOCK: {' → '.join(f'P{p}' for p in cycle)}"
+
+    def _format_cycle(self, start, component):
+        """Rebuild one cycle through `start` inside its strongly connected component."""
+        neighbors = self.wait_graph.get
+        parent = {}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neigh in neighbors(node, ()):
+                if neigh == start:
+                    cycle = [node]
+                    while node != start:
+                        node = parent[node]
+                        cycle.append(node)
+                    cycle.reverse()
+                    cycle.append(start)
+                    return f"DEADLOCK: {' → '.join(f'P{p}' for p in cycle)}"
+                if neigh in component and neigh not in parent:
+                    parent[neigh] = node
+                    queue.append(neigh)
+        return ""
 
     def update_access(self, pid):
-        self.last_access[pid] = time.time()
+        self.last_access[pid] = time.monotonic()
 
     def get_bottlenecks(self):
-        now = time.time()
-        idle = [p for p,t in self.last_access.items() if now-t>2.0]
-        return f"Idle: {', '.join(f'P{p}' for p in idle)}" if idle else ""
\ No newline at end of file
+        cutoff = time.monotonic() - 2.0
+        la = self.last_access
+        items = enumerate(la) if isinstance(la, list) else la.items()
+        idle = [p for p,t in items if t and t<cutoff]
+        return f"Idle: {', '.join(f'P{p}' for p in idle)}" if idle else ""
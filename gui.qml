@@ -133,6 +133,17 @@ ApplicationWindow {
                     // Add a new arrow animation to the model
                     arrows.model = arrows.model.concat([{sx:sx,sy:sy,ex:ex,ey:ey}]);
                 }
+                function onDataFlowBatch(flows) {
+                    // Build all arrows for the batch, then update the model once
+                    var added = [];
+                    for (var i = 0; i < flows.length; i++) {
+                        var src = flows[i][0], dst = flows[i][1];
+                        if (src===-1 || dst===-1) continue; // Ignore invalid
+                        added.push({sx:(src%6)*115+85, sy:Math.floor(src/6)*135+85,
+                                    ex:(dst%6)*115+85, ey:Math.floor(dst/6)*135+85});
+                    }
+                    if (added.length > 0) arrows.model = arrows.model.concat(added);
+                }
             }
         }
 
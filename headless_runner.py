@@ -9,45 +9,49 @@ import multiprocessing as mp
 import time
 from ipc_engine import QueueChannel
 from diagnostics import Diagnostics
-from worker import process_worker
+from worker import process_worker, format_log
 
 
 def run_headless(num_procs: int, seconds: int, deadlock: bool = False):
-    log_q = mp.Queue()
-    control_queues = [mp.Queue() for _ in range(num_procs)]
+    log_q = mp.SimpleQueue()
+    stop_event = mp.Event()
     channel = QueueChannel()
-    diagnostics = Diagnostics() if isinstance(channel, QueueChannel) else None
+    diagnostics = Diagnostics(num_procs) if isinstance(channel, QueueChannel) else None
 
     procs = []
     for i in range(num_procs):
         p = mp.Process(
             target=process_worker,
-            args=(i, num_procs, channel, control_queues[i], log_q, diagnostics, deadlock),
+            args=(i, num_procs, channel, stop_event, log_q, diagnostics, deadlock),
             daemon=True,
         )
         procs.append(p)
         p.start()
 
+    ts = int(time.time())
+    fname = f"ipcsync_log_{ts}.txt"
+    # Stream records to disk as they arrive instead of holding the run in RAM
+    f = open(fname, "wb", buffering=1 << 20)
+
+    def drain():
+        while not log_q.empty():
+            for rec in log_q.get():
+                f.write(format_log(rec).encode() + b"\n")
+
     start = time.time()
-    timeline = []
     try:
         while time.time() - start < seconds:
-            # Drain logs
-            while not log_q.empty():
-                timeline.append(log_q.get())
+            drain()
             time.sleep(0.05)
     finally:
-        for q in control_queues:
-            q.put("STOP")
+        stop_event.set()
         for p in procs:
             p.join(timeout=1.0)
             if p.is_alive():
                 p.terminate()
-
-    ts = int(time.time())
-    fname = f"ipcsync_log_{ts}.txt"
-    with open(fname, "w", encoding="utf-8") as f:
-        f.write("\n".join(timeline))
+        channel.close()
+        drain()
+        f.close()
 
     print(f"Headless run finished; log written to {fname}")
 
@@ -6,34 +6,78 @@ headless smoke tests.
 """
 
 import multiprocessing as mp
+import queue
 import time
 from dataclasses import dataclass
+from multiprocessing import shared_memory
 from typing import Optional
 
+# Optimistic seqlock reads attempted before falling back to the lock
+SEQLOCK_RETRIES = 8
+
+# Contended-lock handling: non-blocking tries, then exponential backoff
+# sleeps (in units of 100 us), then one bounded blocking acquire
+SPIN_TRIES = 8
+SPIN_BACKOFF = (1, 2, 4, 8, 16)
+SPIN_BLOCK_TIMEOUT = 0.05
+
+
+def _spin_acquire(lock, diag=None, waiter: int = -1, owner: int = -1) -> bool:
+    """Acquire `lock`, spinning and backing off before blocking on it.
+
+    Short contention resolves in the spin/backoff phase. Only the final
+    blocking phase is reported to `diag` as `waiter` waiting on `owner`.
+    """
+    for _ in range(SPIN_TRIES):
+        if lock.acquire(block=False):
+            return True
+        time.sleep(0)  # yield the CPU
+    for backoff in SPIN_BACKOFF:
+        time.sleep(backoff * 1e-4)
+        if lock.acquire(block=False):
+            return True
+
+    track = diag is not None and owner >= 0
+    if track:
+        diag.add_wait(waiter, owner)
+    try:
+        return lock.acquire(timeout=SPIN_BLOCK_TIMEOUT)
+    finally:
+        if track:
+            diag.remove_wait(waiter)
+
 
 @dataclass
 class Message:
     src: int
     dst: int
     data: str
-    timestamp: float
+    timestamp: int  # time.monotonic_ns() at send
 
 
 class IPCChannel:
     """Abstract interface for channels used by processes.
 
-    Implementations should provide `send`, `recv`, `status` and
-    `type_name` methods.
+    Implementations should provide `send`, `recv`, `recv_blocking`,
+    `status` and `type_name` methods. `recv_blocking` waits up to
+    `timeout` seconds for a message instead of returning immediately.
+    Channels holding OS resources beyond the process lifetime override
+    `close`.
     """
 
     def send(self, src: int, data: str): ...
 
     def recv(self, dst: int, diag=None) -> Optional[Message]: ...
 
+    def recv_blocking(self, dst: int, diag=None, timeout: float = 0.05) -> Optional[Message]: ...
+
     def status(self) -> str: ...
 
     def type_name(self) -> str: ...
 
+    def close(self):
+        pass
+
 
 class PipeChannel(IPCChannel):
     def __init__(self):
@@ -41,7 +85,7 @@ class PipeChannel(IPCChannel):
         self.in_, self.out_ = mp.Pipe(duplex=False)
 
     def send(self, src, data):
-        self.out_.send((src, data, time.time()))
+        self.out_.send((src, data, time.monotonic_ns()))
 
     def recv(self, dst, diag=None):
         if self.in_.poll():
@@ -49,6 +93,12 @@ class PipeChannel(IPCChannel):
             return Message(src, dst, data, ts)
         return None
 
+    def recv_blocking(self, dst, diag=None, timeout=0.05):
+        if self.in_.poll(timeout):
+            src, data, ts = self.in_.recv()
+            return Message(src, dst, data, ts)
+        return None
+
     def status(self):
         return "Pipe: ready" if self.in_.poll() else "Pipe: empty"
 
@@ -61,7 +111,7 @@ class QueueChannel(IPCChannel):
         self.q = mp.Queue()
 
     def send(self, src, data):
-        self.q.put((src, data, time.time()))
+        self.q.put((src, data, time.monotonic_ns()))
 
     def recv(self, dst, diag=None):
         try:
@@ -70,6 +120,13 @@ class QueueChannel(IPCChannel):
             return None
         return Message(src, dst, data, ts)
 
+    def recv_blocking(self, dst, diag=None, timeout=0.05):
+        try:
+            src, data, ts = self.q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return Message(src, dst, data, ts)
+
     def status(self):
         # qsize may be approximate across processes
         try:
@@ -83,52 +140,116 @@ class QueueChannel(IPCChannel):
 
 
 class SharedMemoryChannel(IPCChannel):
+    """Single-slot shared buffer guarded by a seqlock.
+
+    Writers serialize on `lock` and bump `seq` to an odd value while the
+    slot is being written and back to even when done. Readers snapshot
+    the slot without locking and retry if `seq` moved underneath them.
+    `lock` is only taken to claim a message whose sequence number has not
+    been claimed yet, so each message is received once and idle readers
+    never touch it. Contention on that claim is what gets reported to
+    diagnostics.
+    """
+
     def __init__(self):
-        # Small fixed-size buffer for demonstration purposes
-        self.buf = mp.Array('c', b'\x00' * 256)
-        self.src = mp.Value('i', -1)
-        self.ts = mp.Value('d', 0.0)
+        # Small fixed-size buffer for demonstration purposes, accessed via a
+        # memoryview so reads and writes are single memcpys. The fields are
+        # unsynchronized; `seq` provides the consistency check.
+        self.shm = shared_memory.SharedMemory(create=True, size=256)
+        self.mv = self.shm.buf[:256]
+        self._owner = True
+        self.length = mp.Value('i', 0, lock=False)
+        self.src = mp.Value('i', -1, lock=False)
+        self.ts = mp.Value('q', 0, lock=False)
+        self.seq = mp.Value('I', 0, lock=False)
+        self.claimed = mp.Value('I', 0, lock=False)
         self.lock = mp.Lock()
         self.updated = mp.Event()
 
     def send(self, src, data):
+        # Copy at most 255 bytes straight from the encoded payload via a
+        # memoryview instead of allocating a truncated copy first
+        raw = data.encode()
+        n = min(len(raw), 255)
         with self.lock:
-            b = data.encode()[:255]
-            self.buf[: len(b)] = b
-            self.buf[len(b)] = 0
+            self.seq.value += 1  # odd: write in progress
+            self.mv[:n] = memoryview(raw)[:n]
+            self.length.value = n
             self.src.value = src
-            self.ts.value = time.time()
+            self.ts.value = time.monotonic_ns()
+            self.seq.value += 1  # even: slot consistent
             self.updated.set()
 
+    def _snapshot(self):
+        """Return a consistent `(seq, raw, src, ts)` view of the slot."""
+        seq = self.seq
+        for _ in range(SEQLOCK_RETRIES):
+            s1 = seq.value
+            if s1 & 1:
+                continue
+            raw = bytes(self.mv[: self.length.value])
+            src, ts = self.src.value, self.ts.value
+            if seq.value == s1:
+                return s1, raw, src, ts
+        # A writer kept racing us; read under the lock instead
+        with self.lock:
+            raw = bytes(self.mv[: self.length.value])
+            return seq.value, raw, self.src.value, self.ts.value
+
     def recv(self, dst, diag):
+        return self.recv_blocking(dst, diag, timeout=0.1)
+
+    def recv_blocking(self, dst, diag=None, timeout=0.05):
         # Wait briefly for an update
-        if self.updated.wait(timeout=0.1):
-            with self.lock:
-                if self.ts.value > 0:
-                    raw = self.buf[:].split(b'\x00', 1)[0]
-                    msg = Message(self.src.value, dst, raw.decode(), self.ts.value)
-                    self.ts.value = 0.0
-                    self.updated.clear()
-                    if diag:
-                        diag.update_access(dst)
-                    return msg
-
-        # If lock is contended, report wait info to diagnostics
-        if not self.lock.acquire(block=False):
-            owner = self.src.value
-            if owner >= 0 and diag:
-                diag.add_wait(dst, owner)
-                time.sleep(0.15)
-                diag.remove_wait(dst)
-            return None
-        else:
-            self.lock.release()
-            return None
+        if self.updated.wait(timeout=timeout):
+            s1, raw, src, ts = self._snapshot()
+            # Only a new sequence number is worth locking for; if the lock
+            # is contended, _spin_acquire reports the wait to diagnostics
+            # once spinning gives way to blocking
+            if s1 != self.claimed.value and _spin_acquire(self.lock, diag, dst, src):
+                try:
+                    # Claim only if nobody else did and no newer write landed
+                    if self.claimed.value != s1 and self.seq.value == s1:
+                        self.claimed.value = s1
+                        self.updated.clear()
+                        if diag:
+                            diag.update_access(dst)
+                        return Message(src, dst, raw.decode(), ts)
+                finally:
+                    self.lock.release()
+        return None
 
     def status(self):
-        with self.lock:
-            length = len(self.buf[:].split(b'\x00', 1)[0])
-        return f"SharedMem: {length} bytes"
+        # A single aligned int read; no lock or buffer copy needed
+        return f"SharedMem: {self.length.value} bytes"
+
+    def close(self):
+        """Detach from the segment; the creating process also unlinks it."""
+        if self.mv is None:
+            return
+        self.mv.release()
+        self.mv = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+    def __del__(self):
+        # The memoryview must be released before SharedMemory closes itself
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getstate__(self):
+        # memoryviews cannot be pickled; SharedMemory re-attaches by name
+        state = self.__dict__.copy()
+        del state["mv"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.mv = self.shm.buf[:256]
+        self._owner = False
 
     def type_name(self):
         return "SharedMem"
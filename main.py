@@ -2,23 +2,33 @@ import sys, time, random, psutil
 import multiprocessing as mp
 from collections import deque
 from typing import Optional, List, Deque
-from worker import process_worker
+from worker import WorkerPool, format_log
 
 from PySide6.QtCore import (
-    QObject, Slot, Signal, Property, QRunnable, QThreadPool, QTimer
+    QObject, Slot, Signal, Property, QRunnable, QThreadPool, QTimer,
+    QSocketNotifier
 )
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine, qmlRegisterType
 
 # Import the modules you provided
 from ipc_engine import (
-    IPCChannel, PipeChannel, QueueChannel, SharedMemoryChannel, Message
+    IPCChannel, SharedMemoryChannel, Message
 )
 from diagnostics import Diagnostics
 
-# The real process worker logic lives in `worker.py` and is imported at
-# the top of this file (`from worker import process_worker`). Keeping a
-# single implementation in `worker.py` avoids duplication and makes the
+# Upper bound on lines kept in the live timeline view
+TIMELINE_MAX_LINES = 10000
+
+# Minimum milliseconds between timelineChanged emissions from log batches
+TIMELINE_EMIT_INTERVAL_MS = 50
+
+# Seconds between channel.status() probes (qsize can be a syscall)
+CHANNEL_STATUS_INTERVAL = 2.0
+
+# The real process worker logic lives in `worker.py`; the Backend drives it
+# through a `WorkerPool` so worker processes survive between runs. Keeping
+# a single implementation in `worker.py` avoids duplication and makes the
 # code easier to maintain.
 
 # --- Python-QML Bridge ---
@@ -32,6 +42,9 @@ class Backend(QObject):
     # --- Signals for QML ---
     # Signal(args) - 'dataFlow(int src, int dst)'
     dataFlow = Signal(int, int) 
+    # Signal(list) - 'dataFlowBatch(var flows)', one [src, dst] pair per send.
+    # Emitted once per log batch; dataFlow is kept for compatibility.
+    dataFlowBatch = Signal("QVariantList")
     # Signal() - 'timelineChanged()' (used to notify QML to re-read the property)
     timelineChanged = Signal() 
     # Signal() - 'runningChanged()'
@@ -53,17 +66,24 @@ class Backend(QObject):
         super().__init__(parent)
         self._running = False
         self._status = "Idle"
-        self._timeline = "Welcome to IPCSync Debugger!\n"
+        self._timeline_lines: Deque[str] = deque(
+            ["Welcome to IPCSync Debugger!"], maxlen=TIMELINE_MAX_LINES
+        )
+        self._timeline_cache: Optional[str] = None
         self._alert = ""
         self._throughput = "Throughput: 0.0 msg/s"
         self._latency = "Avg. Latency: 0.00 ms"
         self._deadlock_active = False
         self._channel_type = "Pipe"
         
-        self.processes: List[mp.Process] = []
-        self.control_queues: List[mp.Queue] = []
-        self.log_queue: mp.Queue = mp.Queue()
+        # Worker processes are kept alive between runs and only rebuilt
+        # when the process count changes or a worker gets stuck
+        self._pool: Optional[WorkerPool] = None
+        self.log_queue: mp.SimpleQueue = mp.SimpleQueue()
         self.channel: Optional[IPCChannel] = None
+        self._is_shm = False
+        self._last_status_ts = 0.0
+        self._cached_status = ""
         self.diagnostics: Optional[Diagnostics] = None
         
         self.message_count = 0
@@ -73,10 +93,24 @@ class Backend(QObject):
         # --- NEW PROPERTY ---
         self._frozen_processes: List[int] = []
         
-        # Timer to pull logs from the log_queue
-        self.log_timer = QTimer(self)
-        self.log_timer.timeout.connect(self.update_logs)
-        self.log_timer.start(100) # Check for logs every 100ms
+        # Log batches can arrive once per worker flush; throttle the
+        # resulting timeline re-renders to one per interval. The first
+        # update after idle is emitted immediately (leading edge).
+        self._last_timeline_emit = 0.0
+        self._timeline_emit_timer = QTimer(self)
+        self._timeline_emit_timer.setSingleShot(True)
+        self._timeline_emit_timer.timeout.connect(self._emit_timeline)
+
+        # Pull logs as soon as the log_queue's pipe becomes readable. On
+        # Windows the pipe is not a socket, so fall back to polling.
+        self._log_notifier: Optional[QSocketNotifier] = None
+        self.log_timer: Optional[QTimer] = None
+        if sys.platform == "win32":
+            self.log_timer = QTimer(self)
+            self.log_timer.timeout.connect(self.update_logs)
+            self.log_timer.start(100) # Check for logs every 100ms
+        else:
+            self._watch_log_queue()
         
         # Timer for updating stats/alerts
         self.stats_timer = QTimer(self)
@@ -94,7 +128,9 @@ class Backend(QObject):
 
     @Property(str, notify=timelineChanged)
     def timeline(self):
-        return self._timeline
+        if self._timeline_cache is None:
+            self._timeline_cache = "\n".join(self._timeline_lines)
+        return self._timeline_cache
 
     @Property(str, notify=alertChanged)
     def alert(self):
@@ -129,50 +165,43 @@ class Backend(QObject):
             self.stop()
             return
         
-        self.log_queue = mp.Queue()
-        self.control_queues = [mp.Queue() for _ in range(num_procs)]
-        self.processes = []
-        
-        ipc_map = {0: PipeChannel, 1: QueueChannel, 2: SharedMemoryChannel}
-        self.channel = ipc_map.get(ipc_index, PipeChannel)()
-        self.diagnostics = Diagnostics() if isinstance(self.channel, SharedMemoryChannel) else None
+        if self._pool is None or self._pool.num_procs != num_procs:
+            self._shutdown_pool()
+            self._pool = WorkerPool(num_procs)
+            self.log_queue = self._pool.log_q
+            if self.log_timer is None:
+                self._watch_log_queue()
+
+        # Pool channels are indexed like the IPC combo box; default to Pipe
+        if ipc_index not in (0, 1, 2):
+            ipc_index = 0
+        self.channel = self._pool.channels[ipc_index]
+        self._is_shm = isinstance(self.channel, SharedMemoryChannel)
+        self._last_status_ts = 0.0
+        self.diagnostics = Diagnostics(num_procs) if self._is_shm else None
         
         self._channel_type = self.channel.type_name()
         self.channelTypeChanged.emit()
 
-        self._timeline = f"--- Starting simulation with {num_procs} processes using {self._channel_type} ---\n"
+        self._timeline_lines.clear()
+        self._timeline_lines.append(f"--- Starting simulation with {num_procs} processes using {self._channel_type} ---")
+        self._timeline_cache = None
         self.timelineChanged.emit()
 
-        # --- Create locks for deadlock demo ---
-        lock_A = None
-        lock_B = None
+        # --- Deadlock demo (the pool owns Lock A and Lock B) ---
         is_deadlock_demo = (
             self._deadlock_active and
-            isinstance(self.channel, SharedMemoryChannel) and
+            self._is_shm and
             num_procs > 3 # Need P2 and P3 for the demo
         )
         
         if is_deadlock_demo:
-            lock_A = mp.Lock()
-            lock_B = mp.Lock()
-            self._timeline += "--- DEADLOCK DEMO MODE ENABLED ---\n"
+            self._timeline_lines.append("--- DEADLOCK DEMO MODE ENABLED ---")
+            self._timeline_cache = None
             self.update_status("Running in Deadlock Demo Mode...")
-        # --- End of new lock code ---
-
-        for i in range(num_procs):
-            p = mp.Process(
-                target=process_worker,
-                args=(
-                    i, num_procs, self.channel, self.control_queues[i],
-                    self.log_queue, self.diagnostics,
-                    is_deadlock_demo, # Pass the final flag
-                    lock_A,           # Pass Lock A
-                    lock_B            # Pass Lock B
-                ),
-                daemon=True
-            )
-            self.processes.append(p)
-            p.start()
+        # --- End of deadlock demo setup ---
+
+        self._pool.run(ipc_index, self.diagnostics, is_deadlock_demo)
 
         self._running = True
         self.runningChanged.emit()
@@ -191,16 +220,10 @@ class Backend(QObject):
             return
 
         self.update_status("Stopping...")
-        for q in self.control_queues:
-            q.put("STOP")
-
-        for p in self.processes:
-            p.join(timeout=1.0) # Wait 1s
-            if p.is_alive():
-                p.terminate() # Force kill if stuck
-        
-        self.processes = []
-        self.control_queues = []
+        if not self._pool.stop_run(timeout=1.0):
+            # A worker is stuck (e.g. in the deadlock demo); rebuild next start
+            self._shutdown_pool()
+        self.channel = None
         
         self._running = False
         self.runningChanged.emit()
@@ -217,15 +240,22 @@ class Backend(QObject):
         
         # Final log pull
         self.update_logs()
-        self._timeline += "--- Simulation Stopped ---\n"
+        self._timeline_lines.append("--- Simulation Stopped ---")
+        self._timeline_cache = None
         self.timelineChanged.emit()
 
+    @Slot()
+    def shutdown(self):
+        """Stop any running simulation and terminate the worker pool."""
+        self.stop()
+        self._shutdown_pool()
+
     @Slot()
     def exportLog(self):
         try:
             filename = f"ipcsync_log_{int(time.time())}.txt"
             with open(filename, "w", encoding="utf-8") as f:
-                f.write(self._timeline)
+                f.write("\n".join(self._timeline_lines))
             self.update_status(f"Log exported to {filename}")
         except Exception as e:
             self.update_status(f"Error exporting log: {e}")
@@ -247,63 +277,80 @@ class Backend(QObject):
         self._status = msg
         self.statusChanged.emit()
     
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _watch_log_queue(self):
+        """Attach a read notifier to the current log_queue's pipe."""
+        if self._log_notifier is not None:
+            self._log_notifier.setEnabled(False)
+            self._log_notifier.deleteLater()
+        # SimpleQueue keeps its read end as `_reader`; we are its only reader
+        self._log_notifier = QSocketNotifier(
+            self.log_queue._reader.fileno(), QSocketNotifier.Type.Read, self
+        )
+        self._log_notifier.activated.connect(lambda *_: self.update_logs())
+
     def update_logs(self):
         """Pull messages from the log queue and update the timeline."""
-        new_logs = False
+        # SimpleQueue has no get_nowait; with a single reader, a non-empty
+        # queue guarantees the following get() will not block.
+        batch = []
         while not self.log_queue.empty():
-            try:
-                msg = self.log_queue.get_nowait()
-                self._timeline += f"{msg}\n"
-                new_logs = True
-                
-                # --- Parse log for visualizations ---
-                try:
-                    # Get PID from log line
-                    src_pid = int(msg.split("]")[0].strip("[P"))
-                except:
-                    src_pid = -1
-
-                if src_pid != -1:
-                    # Check for data flow
-                    if "Sending" in msg and "to P" in msg:
-                        parts = msg.split(" ")
-                        try:
-                            dst_pid = int(parts[-1].strip("P"))
-                            self.dataFlow.emit(src_pid, dst_pid)
-                        except:
-                            pass # Failed to parse
-                    
-                    # --- NEW LOGIC FOR METRICS ---
-                    if "Received" in msg and "latency=" in msg:
-                        try:
-                            lat_str = msg.split("latency=")[1].split("s")[0]
-                            self.total_latency += float(lat_str)
-                            self.message_count += 1
-                        except Exception as e:
-                            # You could log this to the console for debugging
-                            # print(f"Error parsing latency: {e}, on msg: {msg}")
-                            pass 
-
-                    # --- NEW LOGIC TO DETECT FREEZE ---
-                    # Check for the log message that indicates a process is about to freeze
-                    if "DEADLOCK_MODE" in msg and "Trying to acquire Lock" in msg:
-                        if src_pid not in self._frozen_processes:
-                            self._frozen_processes.append(src_pid)
-                            self.frozenProcessesChanged.emit() # Tell QML to update
-                    # --- END NEW LOGIC ---
-                
-            except:
-                break # Queue is empty
-        
-        if new_logs:
-            self.timelineChanged.emit()
+            batch.extend(self.log_queue.get())
+
+        if not batch:
+            return
+
+        flows = []
+        for rec in batch:
+            kind = rec[0]
+            if kind == "send":
+                flows.append([rec[1], rec[2]])
+            elif kind == "recv":
+                self.total_latency += rec[4]
+                self.message_count += 1
+            elif kind == "freeze":
+                # The process is about to block on a demo lock
+                src_pid = rec[1]
+                if src_pid not in self._frozen_processes:
+                    self._frozen_processes.append(src_pid)
+                    self.frozenProcessesChanged.emit() # Tell QML to update
+
+        if flows:
+            self.dataFlowBatch.emit(flows)
+
+        self._timeline_lines.extend(map(format_log, batch))
+        self._timeline_cache = None
+        self._emit_timeline_throttled()
+
+    def _emit_timeline(self):
+        self._last_timeline_emit = time.monotonic()
+        self.timelineChanged.emit()
+
+    def _emit_timeline_throttled(self):
+        """Emit timelineChanged now, or once the current interval ends."""
+        if self._timeline_emit_timer.isActive():
+            return # A trailing emit is already scheduled
+        elapsed_ms = (time.monotonic() - self._last_timeline_emit) * 1000
+        if elapsed_ms >= TIMELINE_EMIT_INTERVAL_MS:
+            self._emit_timeline()
+        else:
+            self._timeline_emit_timer.start(int(TIMELINE_EMIT_INTERVAL_MS - elapsed_ms) + 1)
 
     def update_stats(self):
         """Update performance metrics and check for diagnostic alerts."""
         if self._running:
             # Update IPC status
             if self.channel:
-                self.update_status(self.channel.status())
+                now = time.monotonic()
+                if now - self._last_status_ts > CHANNEL_STATUS_INTERVAL:
+                    self._cached_status = self.channel.status()
+                    self._last_status_ts = now
+                if self._cached_status != self._status:
+                    self.update_status(self._cached_status)
             
             # Update performance metrics
             elapsed = time.time() - self.start_time
@@ -351,7 +398,7 @@ def main():
         sys.exit(-1)
         
     # Set app to stop backend when quitting
-    app.aboutToQuit.connect(backend.stop)
+    app.aboutToQuit.connect(backend.shutdown)
     
     sys.exit(app.exec())
 
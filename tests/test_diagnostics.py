@@ -0,0 +1,94 @@
+import unittest
+from diagnostics import Diagnostics
+
+
+def graph_diag(edges):
+    """Build a Diagnostics whose wait graph is set directly, bypassing add_wait."""
+    d = Diagnostics()
+    for waiter, owners in edges.items():
+        d.wait_graph[waiter].update(owners)
+    d._version += 1
+    return d
+
+
+class TestDeadlockDetection(unittest.TestCase):
+    def test_no_cycle(self):
+        d = Diagnostics()
+        d.add_wait(0, 1)
+        d.add_wait(1, 2)
+        self.assertEqual(d.alert, "")
+
+    def test_two_process_cycle(self):
+        d = Diagnostics()
+        d.add_wait(2, 3)
+        d.add_wait(3, 2)
+        self.assertIn(d.alert, ("DEADLOCK: P2 → P3 → P2", "DEADLOCK: P3 → P2 → P3"))
+
+    def test_cycle_cleared_on_remove(self):
+        d = Diagnostics()
+        d.add_wait(0, 1)
+        d.add_wait(1, 2)
+        d.add_wait(2, 0)
+        self.assertTrue(d.alert.startswith("DEADLOCK:"))
+        d.remove_wait(2)
+        d.check_deadlock()
+        self.assertEqual(d.alert, "")
+
+
+class TestCheckDeadlock(unittest.TestCase):
+    def test_multi_owner_cycle(self):
+        d = graph_diag({0: {1, 2}, 2: {0}})
+        d.check_deadlock()
+        self.assertIn(d.alert, ("DEADLOCK: P0 → P2 → P0", "DEADLOCK: P2 → P0 → P2"))
+
+    def test_multi_owner_no_cycle(self):
+        d = graph_diag({0: {1, 2}})
+        d.check_deadlock()
+        self.assertEqual(d.alert, "")
+
+    def test_self_loop(self):
+        d = graph_diag({5: {5}})
+        d.check_deadlock()
+        self.assertEqual(d.alert, "DEADLOCK: P5 → P5")
+
+    def test_unchanged_graph_skips_scan(self):
+        d = graph_diag({0: {1}})
+        d.check_deadlock()
+        self.assertEqual(d.alert, "")
+        # Mutating without bumping _version must not trigger a rescan
+        d.wait_graph[1].add(0)
+        d.check_deadlock()
+        self.assertEqual(d.alert, "")
+        d._version += 1
+        d.check_deadlock()
+        self.assertTrue(d.alert.startswith("DEADLOCK:"))
+
+    def test_long_chain_is_linear(self):
+        n = 4000
+        d = graph_diag({i: {i + 1} for i in range(n)})
+        calls = 0
+        next_owner = d._next_owner
+
+        def counting_next_owner(node):
+            nonlocal calls
+            calls += 1
+            return next_owner(node)
+
+        d._next_owner = counting_next_owner
+        d.check_deadlock()
+        self.assertEqual(d.alert, "")
+        # At most len(wait_graph) Floyd steps, three owner lookups each
+        self.assertLessEqual(calls, 3 * n)
+
+    def test_long_chain_into_cycle(self):
+        n = 4000
+        edges = {i: {i + 1} for i in range(n)}
+        edges[n] = {n - 2}
+        d = graph_diag(edges)
+        d.check_deadlock()
+        self.assertIn(f"P{n - 2}", d.alert)
+        self.assertTrue(d.alert.startswith("DEADLOCK:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import multiprocessing as mp
-from ipc_engine import QueueChannel
+from multiprocessing import shared_memory
+from ipc_engine import QueueChannel, PipeChannel, SharedMemoryChannel
 
 
 class TestQueueChannel(unittest.TestCase):
@@ -20,6 +21,93 @@ class TestQueueChannel(unittest.TestCase):
         self.assertEqual(m2.data, "msg2")
 
 
+class TestRecvBlocking(unittest.TestCase):
+    def test_pipe_recv_blocking(self):
+        ch = PipeChannel()
+        self.assertIsNone(ch.recv_blocking(0, timeout=0.01))
+        ch.send(1, "hello")
+        m = ch.recv_blocking(0, timeout=1.0)
+        self.assertIsNotNone(m)
+        self.assertEqual((m.src, m.data), (1, "hello"))
+
+    def test_queue_recv_blocking(self):
+        ch = QueueChannel()
+        ch.send(1, "hello")
+        m = ch.recv_blocking(0, timeout=1.0)
+        self.assertIsNotNone(m)
+        self.assertEqual(m.data, "hello")
+
+
+def _recv_in_child(ch, out_q):
+    m = ch.recv_blocking(1, timeout=5.0)
+    out_q.put(((m.src, m.data) if m else None, ch._owner))
+    ch.close()
+    ch.close()
+
+
+class TestSharedMemoryChannel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Exercise the pickling path workers use (the GUI and headless
+        # runner spawn); channels must be created in the same context
+        cls._prev_method = mp.get_start_method(allow_none=True)
+        mp.set_start_method("spawn", force=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        mp.set_start_method(cls._prev_method, force=True)
+
+    def setUp(self):
+        self.ch = SharedMemoryChannel()
+        self.addCleanup(self.ch.close)
+
+    def test_send_recv(self):
+        self.ch.send(3, "hello")
+        m = self.ch.recv_blocking(0, timeout=1.0)
+        self.assertIsNotNone(m)
+        self.assertEqual((m.src, m.dst, m.data), (3, 0, "hello"))
+
+    def test_truncates_to_255_bytes(self):
+        self.ch.send(0, "x" * 300)
+        m = self.ch.recv_blocking(1, timeout=1.0)
+        self.assertEqual(m.data, "x" * 255)
+
+    def test_status_reports_length(self):
+        self.assertEqual(self.ch.status(), "SharedMem: 0 bytes")
+        self.ch.send(0, "abcd")
+        self.assertEqual(self.ch.status(), "SharedMem: 4 bytes")
+        self.ch.send(0, "x" * 300)
+        self.assertEqual(self.ch.status(), "SharedMem: 255 bytes")
+
+    def test_message_claimed_once(self):
+        self.ch.send(0, "once")
+        self.assertIsNotNone(self.ch.recv_blocking(1, timeout=1.0))
+        self.assertIsNone(self.ch.recv_blocking(2, timeout=0.05))
+
+    def test_child_process_receives_without_unlinking(self):
+        out_q = mp.Queue()
+        self.ch.send(7, "from parent")
+        p = mp.Process(target=_recv_in_child, args=(self.ch, out_q))
+        p.start()
+        try:
+            received, child_owner = out_q.get(timeout=10.0)
+        finally:
+            p.join(timeout=5.0)
+        self.assertEqual(received, (7, "from parent"))
+        self.assertFalse(child_owner)
+        self.assertEqual(p.exitcode, 0)
+        # The child's close() detached without unlinking the segment
+        probe = shared_memory.SharedMemory(name=self.ch.shm.name)
+        probe.close()
+
+    def test_owner_close_is_idempotent_and_unlinks(self):
+        name = self.ch.shm.name
+        self.ch.close()
+        self.ch.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
 if __name__ == "__main__":
     mp.set_start_method("spawn", force=False)
     unittest.main()
@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+import multiprocessing as mp
+from diagnostics import Diagnostics
+from ipc_engine import Message
+from worker import WorkerPool, process_worker, LOG_FLUSH_INTERVAL_NS
+
+
+def drain(log_q):
+    records = []
+    while not log_q.empty():
+        records.extend(log_q.get())
+    return records
+
+
+class TestWorkerPool(unittest.TestCase):
+    def make_pool(self, num_procs):
+        pool = WorkerPool(num_procs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_stop_run_returns_true_for_normal_run(self):
+        pool = self.make_pool(2)
+        pool.run(0)
+        time.sleep(0.3)
+        self.assertTrue(pool.stop_run(timeout=2.0))
+
+    def test_stop_run_returns_false_for_deadlock_demo(self):
+        pool = self.make_pool(4)
+        pool.run(2, Diagnostics(4), deadlock_mode=True)
+        time.sleep(0.3)
+        self.assertFalse(pool.stop_run(timeout=1.0))
+
+    def test_second_run_produces_new_records(self):
+        pool = self.make_pool(2)
+        for ipc_index in (0, 1):
+            pool.run(ipc_index)
+            time.sleep(0.3)
+            self.assertTrue(pool.stop_run(timeout=2.0))
+            started = {r[1] for r in drain(pool.log_q) if r == ("info", r[1], "Started.")}
+            self.assertEqual(started, {0, 1})
+
+    def test_messages_from_before_run_are_dropped(self):
+        pool = self.make_pool(2)
+        pool.channels[0].send(9, "stale")
+        pool.run(0)
+        time.sleep(0.5)
+        self.assertTrue(pool.stop_run(timeout=2.0))
+        recvs = [r for r in drain(pool.log_q) if r[0] == "recv"]
+        self.assertNotIn(9, [r[2] for r in recvs])
+
+
+class TestProcessWorker(unittest.TestCase):
+    def test_buffered_records_flushed_on_exception(self):
+        log_q = mp.SimpleQueue()
+        # Deadlock mode without locks makes P2 raise on lock_A.acquire()
+        with self.assertRaises(AttributeError):
+            process_worker(2, 4, None, mp.Event(), log_q, deadlock_mode=True)
+        texts = [r[2] for r in drain(log_q) if r[0] == "info"]
+        self.assertEqual(texts, ["Started.", "DEADLOCK_MODE (P2): Acquiring Lock A..."])
+
+    def test_recv_record_flushed_within_interval(self):
+        class OneShotChannel:
+            delivered_ns = None
+
+            def recv_blocking(self, dst, diag=None, timeout=0.05):
+                if self.delivered_ns is None:
+                    self.delivered_ns = time.monotonic_ns()
+                    return Message(1, dst, "hi", self.delivered_ns)
+                time.sleep(timeout)
+                return None
+
+            def send(self, src, data):
+                pass
+
+        class RecordingQueue:
+            def __init__(self):
+                self.puts = []
+
+            def put(self, batch):
+                self.puts.append((time.monotonic_ns(), batch))
+
+        channel, log_q, stop = OneShotChannel(), RecordingQueue(), threading.Event()
+        # pid 0's seeded PRNG sleeps ~200 ms after the recv, well past the interval
+        t = threading.Thread(target=process_worker, args=(0, 2, channel, stop, log_q))
+        t.start()
+        time.sleep(0.4)
+        stop.set()
+        t.join(timeout=2.0)
+
+        put_ns = next(ts for ts, batch in log_q.puts if any(r[0] == "recv" for r in batch))
+        # Allow some scheduling slack on top of the flush interval
+        self.assertLess(put_ns - channel.delivered_ns, LOG_FLUSH_INTERVAL_NS + 20_000_000)
+
+
+if __name__ == "__main__":
+    mp.set_start_method("spawn", force=False)
+    unittest.main()
@@ -1,80 +1,236 @@
-import time, random
+import time, random, itertools, queue
 import multiprocessing as mp
-from typing import Optional
+from typing import Optional, List
 
-from ipc_engine import IPCChannel
+from ipc_engine import IPCChannel, PipeChannel, QueueChannel, SharedMemoryChannel
 from diagnostics import Diagnostics
 
+# Log records are plain tuples `(kind, pid, *payload)` so the GUI can
+# dispatch on `kind` without re-parsing formatted text:
+#   ("info", pid, text)
+#   ("send", pid, dst, data)
+#   ("recv", pid, src, data, latency)
+#   ("freeze", pid, lock_name)
+# Workers buffer records locally and put them on the log queue as tuple
+# batches, flushed every LOG_BATCH_SIZE records or LOG_FLUSH_INTERVAL_NS.
+LOG_BATCH_SIZE = 32
+LOG_FLUSH_INTERVAL_NS = 50_000_000
+
+# Number of precomputed send-jitter values each worker cycles through
+JITTER_SCHEDULE_LEN = 64
+
+def format_log(rec: tuple) -> str:
+    """Render a log record as a human-readable timeline line."""
+    kind, pid = rec[0], rec[1]
+    if kind == "send":
+        return f"[P{pid}] Sending '{rec[3]}' to P{rec[2]}"
+    if kind == "recv":
+        return f"[P{pid}] Received '{rec[3]}' from P{rec[2]}, latency={rec[4]:.4f}s"
+    if kind == "freeze":
+        return f"[P{pid}] DEADLOCK_MODE (P{pid}): Trying to acquire {rec[2]}..."
+    return f"[P{pid}] {rec[2]}"
+
 def process_worker(
     pid: int,
     num_procs: int,
     channel: IPCChannel,
-    control_q: mp.Queue,
-    log_q: mp.Queue,
+    stop_event: mp.Event,
+    log_q: mp.SimpleQueue,
     diag: Optional[Diagnostics] = None,
     deadlock_mode: bool = False,
     lock_A: Optional[mp.Lock] = None, 
-    lock_B: Optional[mp.Lock] = None
+    lock_B: Optional[mp.Lock] = None,
+    started_ns: int = 0
 ):
     """
     The target function for each simulated process.
-    It sends and receives messages, simulating work.
+    It sends and receives messages, simulating work. Messages stamped
+    before `started_ns` are leftovers from a previous run and are dropped.
     """
-    log = lambda msg: log_q.put(f"[P{pid}] {msg}")
-    log("Started.")
-
-    if deadlock_mode:
-        if pid == 2:
-            log(f"DEADLOCK_MODE (P{pid}): Acquiring Lock A...")
-            lock_A.acquire()
-            log(f"DEADLOCK_MODE (P{pid}): Acquired Lock A. Simulating work...")
-            time.sleep(1) # Give P3 time to grab Lock B
-            log(f"DEADLOCK_MODE (P{pid}): Trying to acquire Lock B...")
-            lock_B.acquire() # This will block forever
-            log(f"DEADLOCK_MODE (P{pid}): Acquired Lock B.")
-            lock_B.release()
-            lock_A.release()
-
-        elif pid == 3:
-            log(f"DEADLOCK_MODE (P{pid}): Acquiring Lock B...")
-            lock_B.acquire()
-            log(f"DEADLOCK_MODE (P{pid}): Acquired Lock B. Simulating work...")
-            time.sleep(1) # Give P2 time to grab Lock A
-            log(f"DEADLOCK_MODE (P{pid}): Trying to acquire Lock A...")
-            lock_A.acquire() # This will block forever
-            log(f"DEADLOCK_MODE (P{pid}): Acquired Lock A.")
-            lock_A.release()
-            lock_B.release()
-
-    # Normal operation
-    last_send_time = time.time()
-    while True:
-        try:
-            if not control_q.empty() and control_q.get() == "STOP":
-                log("Stopping.")
-                break
+    buf = []
+    last_flush = time.monotonic_ns()
+
+    def flush():
+        nonlocal last_flush
+        if buf:
+            log_q.put(tuple(buf))
+            buf.clear()
+        last_flush = time.monotonic_ns()
+
+    def emit(*rec):
+        buf.append(rec)
+        if len(buf) >= LOG_BATCH_SIZE or time.monotonic_ns() - last_flush > LOG_FLUSH_INTERVAL_NS:
+            flush()
+
+    def pause(seconds):
+        """Sleep, flushing buffered records once their flush deadline passes."""
+        end = time.monotonic_ns() + int(seconds * 1e9)
+        if buf:
+            deadline = last_flush + LOG_FLUSH_INTERVAL_NS
+            if deadline < end:
+                time.sleep(max(0, deadline - time.monotonic_ns()) * 1e-9)
+                flush()
+        time.sleep(max(0, end - time.monotonic_ns()) * 1e-9)
+
+    log = lambda msg: emit("info", pid, msg)
+    try:
+        log("Started.")
+
+        if deadlock_mode:
+            if pid == 2:
+                log(f"DEADLOCK_MODE (P{pid}): Acquiring Lock A...")
+                lock_A.acquire()
+                log(f"DEADLOCK_MODE (P{pid}): Acquired Lock A. Simulating work...")
+                time.sleep(1) # Give P3 time to grab Lock B
+                emit("freeze", pid, "Lock B")
+                flush()
+                lock_B.acquire() # This will block forever
+                log(f"DEADLOCK_MODE (P{pid}): Acquired Lock B.")
+                lock_B.release()
+                lock_A.release()
+
+            elif pid == 3:
+                log(f"DEADLOCK_MODE (P{pid}): Acquiring Lock B...")
+                lock_B.acquire()
+                log(f"DEADLOCK_MODE (P{pid}): Acquired Lock B. Simulating work...")
+                time.sleep(1) # Give P2 time to grab Lock A
+                emit("freeze", pid, "Lock A")
+                flush()
+                lock_A.acquire() # This will block forever
+                log(f"DEADLOCK_MODE (P{pid}): Acquired Lock A.")
+                lock_A.release()
+                lock_B.release()
+
+        # Normal operation
+        # A per-worker PRNG seeded by pid avoids the shared global generator
+        # and makes each worker's send pattern reproducible across runs
+        rng = random.Random(pid)
+        uniform, randint = rng.uniform, rng.randint
+        next_jitter = itertools.cycle(
+            [randint(500_000_000, 2_000_000_000) for _ in range(JITTER_SCHEDULE_LEN)]
+        ).__next__
+
+        # Timestamps are integer ns from the system-wide monotonic clock,
+        # read once per iteration (and again after simulated work) and
+        # converted to seconds only for logging
+        last_send_ns = time.monotonic_ns()
+        jitter_ns = next_jitter()
+        while not stop_event.is_set():
+            try:
+                # Block on the channel instead of sleep-polling; the timeout
+                # bounds how long a STOP request can go unnoticed.
+                msg = channel.recv_blocking(pid, diag, timeout=0.05)
+                now_ns = time.monotonic_ns()
+                if msg and msg.timestamp >= started_ns:
+                    latency = (now_ns - msg.timestamp) * 1e-9
+                    emit("recv", pid, msg.src, msg.data, latency)
+                    pause(uniform(0.05, 0.2))
+                    # The work sleep made the iteration's clock read stale
+                    now_ns = time.monotonic_ns()
 
-            msg = channel.recv(pid, diag)
-            if msg:
-                latency = time.time() - msg.timestamp
-                log(f"Received '{msg.data}' from P{msg.src}, latency={latency:.4f}s")
-                time.sleep(random.uniform(0.05, 0.2))
+                if now_ns - last_send_ns > jitter_ns:
+                    dst = randint(0, num_procs - 1)
+                    if dst == pid:
+                        dst = (pid + 1) % num_procs
 
-            if time.time() - last_send_time > random.uniform(0.5, 2.0):
-                dst = random.randint(0, num_procs - 1)
-                if dst == pid:
-                    dst = (pid + 1) % num_procs
+                    data = f"Hello from P{pid}"
+                    emit("send", pid, dst, data)
+                    channel.send(pid, data)
+                    last_send_ns = now_ns
+                    jitter_ns = next_jitter()
 
-                data = f"Hello from P{pid}"
-                log(f"Sending '{data}' to P{dst}")
-                channel.send(pid, data)
-                last_send_time = time.time()
+                if buf and now_ns - last_flush > LOG_FLUSH_INTERVAL_NS:
+                    flush()
+
+            except (BrokenPipeError, EOFError):
+                log("Channel closed. Exiting.")
+                break
+            except Exception as e:
+                log(f"ERROR: {e}")
+                break
+
+        if stop_event.is_set():
+            log("Stopping.")
+    finally:
+        # Never drop buffered records, even if the body raises
+        flush()
 
-            time.sleep(0.01)
 
-        except (BrokenPipeError, EOFError):
-            log("Channel closed. Exiting.")
+def _worker_main(pid, cfg_q, idle_q, channels, stop_event, log_q, lock_A, lock_B):
+    """Pool entry point: run one simulation per config until sent None."""
+    while True:
+        cfg = cfg_q.get()
+        if cfg is None:
             break
-        except Exception as e:
-            log(f"ERROR: {e}")
-            break
\ No newline at end of file
+        num_procs, ipc_index, diag, deadlock_mode, started_ns = cfg
+        process_worker(
+            pid, num_procs, channels[ipc_index], stop_event, log_q, diag,
+            deadlock_mode, lock_A, lock_B, started_ns
+        )
+        idle_q.put(pid)
+
+
+class WorkerPool:
+    """Long-lived worker processes reused across simulation runs.
+
+    Synchronization primitives can only reach a child through inheritance,
+    so the log queue, stop event, demo locks and one channel of each type
+    are created with the pool. Each run is started by sending a plain
+    config tuple to every worker; `channels` is indexed like the GUI's
+    IPC combo box.
+    """
+
+    def __init__(self, num_procs: int):
+        self.num_procs = num_procs
+        self.channels: List[IPCChannel] = [PipeChannel(), QueueChannel(), SharedMemoryChannel()]
+        self.log_q = mp.SimpleQueue()
+        self.stop_event = mp.Event()
+        self.lock_A = mp.Lock()
+        self.lock_B = mp.Lock()
+        self._idle_q = mp.Queue()
+        self._cfg_qs = [mp.SimpleQueue() for _ in range(num_procs)]
+        self.processes: List[mp.Process] = []
+        for i in range(num_procs):
+            p = mp.Process(
+                target=_worker_main,
+                args=(
+                    i, self._cfg_qs[i], self._idle_q, self.channels,
+                    self.stop_event, self.log_q, self.lock_A, self.lock_B
+                ),
+                daemon=True
+            )
+            self.processes.append(p)
+            p.start()
+
+    def run(self, ipc_index: int, diag: Optional[Diagnostics] = None, deadlock_mode: bool = False):
+        """Start a new simulation run on every worker."""
+        cfg = (self.num_procs, ipc_index, diag, deadlock_mode, time.monotonic_ns())
+        for q in self._cfg_qs:
+            q.put(cfg)
+
+    def stop_run(self, timeout: float = 1.0) -> bool:
+        """Stop the current run; return True once every worker is idle again."""
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        idle = 0
+        try:
+            while idle < self.num_procs:
+                self._idle_q.get(timeout=max(0.0, deadline - time.monotonic()))
+                idle += 1
+        except queue.Empty:
+            return False
+        self.stop_event.clear()
+        return True
+
+    def shutdown(self):
+        """Stop all workers, killing any that are stuck, and free channels."""
+        self.stop_event.set()
+        for q in self._cfg_qs:
+            q.put(None)
+        for p in self.processes:
+            p.join(timeout=1.0) # Wait 1s
+            if p.is_alive():
+                p.terminate() # Force kill if stuck
+        self.processes = []
+        for ch in self.channels:
+            ch.close()